@@ -5,16 +5,31 @@
 
 import yaml
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, TextIO, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 
 from ..exceptions.custom_exceptions import ConfigurationException
 
+# 优先使用libyaml的C实现解析和输出YAML，未编译libyaml时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+# 默认分类规则文件路径
+DEFAULT_RULES_FILE = "config/classification-rules.yaml"
+
+# 已解析的规则文件缓存：文件绝对路径 -> ((st_mtime_ns, st_size), 解析结果)
+_parsed_cache: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+
 
 @dataclass
 class ClassificationRule:
     """分类规则数据类"""
+    # 规则数量随频道增长，使用__slots__省去每个实例的__dict__（Python 3.9不支持dataclass(slots=True)）
+    __slots__ = ('channel_id', 'classfyname', 'classfy')
+    
     channel_id: str
     classfyname: str
     classfy: str
@@ -23,56 +38,64 @@ class ClassificationRule:
 class ClassificationConfig:
     """分类映射配置管理类"""
     
-    def __init__(self, rules_file: str = None):
+    def __init__(self, rules_file: Union[str, TextIO] = None):
         """
         初始化分类配置
         
         Args:
-            rules_file: 分类规则文件路径
+            rules_file: 分类规则文件路径，或已打开的YAML文本流（如io.StringIO）
         """
-        self.rules_file = rules_file or "config/classification-rules.yaml"
-        self.rules: Dict[str, ClassificationRule] = {}
-        self.default_rule: ClassificationRule = None
+        # 传入文本流时直接从流中解析，不关联规则文件，也不做文件变更检查
+        self._rules_stream: Optional[TextIO] = None
+        if hasattr(rules_file, 'read'):
+            self._rules_stream = rules_file
+            self.rules_file = None
+        else:
+            self.rules_file = rules_file or DEFAULT_RULES_FILE
         self._last_modified: float = 0
         
+        # 分类规则以扁平索引保存（频道ID -> 分类名称 / 分类代码），是规则数据的唯一来源；
+        # 规则对象仅在rules、default_rule等接口中按需构建
+        self._classfyname_by_channel: Dict[str, str] = {}
+        self._classfy_by_channel: Dict[str, str] = {}
+        self._default_classfyname: Optional[str] = None
+        self._default_classfy: Optional[str] = None
+        
         # 加载配置
         self._load_config()
     
     def _load_config(self) -> None:
         """加载分类配置文件"""
         try:
-            if not os.path.exists(self.rules_file):
+            if self._rules_stream is not None:
+                config_data = yaml.load(self._rules_stream, Loader=YamlLoader)
+            elif not os.path.exists(self.rules_file):
                 raise ConfigurationException(f"Classification rules file not found: {self.rules_file}")
-            
-            with open(self.rules_file, 'r', encoding='utf-8') as file:
-                config_data = yaml.safe_load(file)
+            else:
+                config_data = self._read_config_data()
             
             if not config_data or 'classification_rules' not in config_data:
                 raise ConfigurationException("Invalid classification rules file format")
             
             # 解析分类规则
-            self.rules.clear()
+            self._classfyname_by_channel.clear()
+            self._classfy_by_channel.clear()
             for rule_data in config_data['classification_rules']:
                 if 'channel_id' not in rule_data:
                     raise ConfigurationException("Missing 'channel_id' in classification rule")
                 
-                rule = ClassificationRule(
-                    channel_id=str(rule_data['channel_id']),
-                    classfyname=rule_data.get('classfyname', '其他'),
-                    classfy=rule_data.get('classfy', 'QT')
-                )
-                self.rules[rule.channel_id] = rule
+                channel_id = str(rule_data['channel_id'])
+                self._classfyname_by_channel[channel_id] = rule_data.get('classfyname', '其他')
+                self._classfy_by_channel[channel_id] = rule_data.get('classfy', 'QT')
             
             # 设置默认规则
             default_config = config_data.get('default', {})
-            self.default_rule = ClassificationRule(
-                channel_id='default',
-                classfyname=default_config.get('classfyname', '其他'),
-                classfy=default_config.get('classfy', 'QT')
-            )
+            self._default_classfyname = default_config.get('classfyname', '其他')
+            self._default_classfy = default_config.get('classfy', 'QT')
             
             # 记录文件修改时间
-            self._last_modified = os.path.getmtime(self.rules_file)
+            if self.rules_file is not None:
+                self._last_modified = os.path.getmtime(self.rules_file)
             
         except yaml.YAMLError as e:
             raise ConfigurationException(f"Failed to parse classification rules file: {str(e)}", cause=e)
@@ -81,6 +104,56 @@ class ClassificationConfig:
                 raise
             raise ConfigurationException(f"Failed to load classification configuration: {str(e)}", cause=e)
     
+    def _read_config_data(self) -> dict:
+        """
+        读取并解析分类规则文件，文件未变化时复用缓存的解析结果
+        
+        Returns:
+            dict: 解析后的配置数据
+        """
+        cache_key = os.path.abspath(self.rules_file)
+        stat = os.stat(self.rules_file)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        
+        cached = _parsed_cache.get(cache_key)
+        if cached is not None and cached[0] == file_key:
+            return cached[1]
+        
+        with open(self.rules_file, 'r', encoding='utf-8') as file:
+            config_data = yaml.load(file, Loader=YamlLoader)
+        
+        _parsed_cache[cache_key] = (file_key, config_data)
+        return config_data
+    
+    @property
+    def rules(self) -> Dict[str, ClassificationRule]:
+        """
+        全部分类规则（频道ID -> 规则对象），每次访问按扁平索引重新构建
+        
+        返回的字典和规则对象只是快照，修改它们不会影响配置；增删规则请使用add_rule/remove_rule
+        """
+        return {
+            channel_id: ClassificationRule(channel_id, classfyname, self._classfy_by_channel[channel_id])
+            for channel_id, classfyname in self._classfyname_by_channel.items()
+        }
+    
+    @property
+    def default_rule(self) -> Optional[ClassificationRule]:
+        """默认分类规则，每次访问重新构建，未设置时为None"""
+        if self._default_classfyname is None or self._default_classfy is None:
+            return None
+        return ClassificationRule('default', self._default_classfyname, self._default_classfy)
+    
+    @default_rule.setter
+    def default_rule(self, rule: Optional[ClassificationRule]) -> None:
+        """设置默认分类规则，传入None表示清除"""
+        if rule is None:
+            self._default_classfyname = None
+            self._default_classfy = None
+        else:
+            self._default_classfyname = rule.classfyname
+            self._default_classfy = rule.classfy
+    
     def get_classification(self, channel_id: str) -> Tuple[str, str]:
         """
         根据频道ID获取分类信息
@@ -94,12 +167,12 @@ class ClassificationConfig:
         # 检查是否需要重新加载配置
         self._check_reload()
         
-        # 查找匹配的规则
-        rule = self.rules.get(str(channel_id))
-        if rule is None:
-            rule = self.default_rule
-        
-        return rule.classfyname, rule.classfy
+        # 直接查扁平索引，未匹配时使用默认分类
+        channel_id = str(channel_id)
+        return (
+            self._classfyname_by_channel.get(channel_id, self._default_classfyname),
+            self._classfy_by_channel.get(channel_id, self._default_classfy)
+        )
     
     def get_classification_rule(self, channel_id: str) -> ClassificationRule:
         """
@@ -114,7 +187,11 @@ class ClassificationConfig:
         # 检查是否需要重新加载配置
         self._check_reload()
         
-        return self.rules.get(str(channel_id), self.default_rule)
+        channel_id = str(channel_id)
+        classfyname = self._classfyname_by_channel.get(channel_id)
+        if classfyname is None:
+            return self.default_rule
+        return ClassificationRule(channel_id, classfyname, self._classfy_by_channel[channel_id])
     
     def get_all_rules(self) -> List[ClassificationRule]:
         """
@@ -138,7 +215,7 @@ class ClassificationConfig:
         # 检查是否需要重新加载配置
         self._check_reload()
         
-        return list(self.rules.keys())
+        return list(self._classfyname_by_channel.keys())
     
     def add_rule(self, channel_id: str, classfyname: str, classfy: str) -> None:
         """
@@ -149,12 +226,9 @@ class ClassificationConfig:
             classfyname: 分类名称
             classfy: 分类代码
         """
-        rule = ClassificationRule(
-            channel_id=str(channel_id),
-            classfyname=classfyname,
-            classfy=classfy
-        )
-        self.rules[str(channel_id)] = rule
+        channel_id = str(channel_id)
+        self._classfyname_by_channel[channel_id] = classfyname
+        self._classfy_by_channel[channel_id] = classfy
     
     def remove_rule(self, channel_id: str) -> bool:
         """
@@ -167,13 +241,17 @@ class ClassificationConfig:
             bool: 是否成功移除
         """
         channel_id = str(channel_id)
-        if channel_id in self.rules:
-            del self.rules[channel_id]
+        if channel_id in self._classfyname_by_channel:
+            del self._classfyname_by_channel[channel_id]
+            del self._classfy_by_channel[channel_id]
             return True
         return False
     
     def save_config(self) -> None:
         """保存配置到文件"""
+        if self.rules_file is None:
+            raise ConfigurationException("Cannot save classification configuration loaded from a stream")
+        
         try:
             # 构建配置数据
             config_data = {
@@ -196,7 +274,7 @@ class ClassificationConfig:
             
             # 写入文件
             with open(self.rules_file, 'w', encoding='utf-8') as file:
-                yaml.dump(config_data, file, default_flow_style=False, allow_unicode=True)
+                yaml.dump(config_data, file, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
             
             # 更新修改时间
             self._last_modified = os.path.getmtime(self.rules_file)
@@ -206,6 +284,9 @@ class ClassificationConfig:
     
     def _check_reload(self) -> None:
         """检查是否需要重新加载配置"""
+        if self.rules_file is None:
+            return
+        
         try:
             if os.path.exists(self.rules_file):
                 current_modified = os.path.getmtime(self.rules_file)
@@ -216,7 +297,12 @@ class ClassificationConfig:
             pass
     
     def reload(self) -> None:
-        """强制重新加载配置"""
+        """强制重新加载配置（丢弃缓存的解析结果）"""
+        if self._rules_stream is not None:
+            # 文本流从头重新解析
+            self._rules_stream.seek(0)
+        else:
+            _parsed_cache.pop(os.path.abspath(self.rules_file), None)
         self._load_config()
     
     def validate_config(self) -> None:
@@ -240,20 +326,21 @@ class ClassificationConfig:
             Dict[str, int]: 统计信息
         """
         return {
-            'total_rules': len(self.rules),
-            'unique_channels': len(set(self.rules.keys())),
-            'unique_classfy': len(set(rule.classfy for rule in self.rules.values())),
-            'unique_classfyname': len(set(rule.classfyname for rule in self.rules.values()))
+            'total_rules': len(self._classfyname_by_channel),
+            'unique_channels': len(set(self._classfyname_by_channel.keys())),
+            'unique_classfy': len(set(self._classfy_by_channel.values())),
+            'unique_classfyname': len(set(self._classfyname_by_channel.values()))
         }
 
 
-# 全局分类配置实例
-_classification_config: Optional[ClassificationConfig] = None
+# 全局分类配置实例缓存：规则文件真实路径 -> 分类配置实例
+# 规则文件的变更由实例的查询方法自行检查并重新加载
+_classification_configs: Dict[str, ClassificationConfig] = {}
 
 
 def get_classification_config(rules_file: str = None) -> ClassificationConfig:
     """
-    获取全局分类配置实例
+    获取全局分类配置实例，按规则文件真实路径分别缓存
     
     Args:
         rules_file: 分类规则文件路径
@@ -261,10 +348,12 @@ def get_classification_config(rules_file: str = None) -> ClassificationConfig:
     Returns:
         ClassificationConfig: 分类配置实例
     """
-    global _classification_config
-    if _classification_config is None:
-        _classification_config = ClassificationConfig(rules_file)
-    return _classification_config
+    key = os.path.realpath(rules_file or DEFAULT_RULES_FILE)
+    config = _classification_configs.get(key)
+    if config is None:
+        config = ClassificationConfig(rules_file)
+        _classification_configs[key] = config
+    return config
 
 
 def reload_classification_config(rules_file: str = None) -> ClassificationConfig:
@@ -277,6 +366,6 @@ def reload_classification_config(rules_file: str = None) -> ClassificationConfig
     Returns:
         ClassificationConfig: 重新加载的分类配置实例
     """
-    global _classification_config
-    _classification_config = ClassificationConfig(rules_file)
-    return _classification_config
\ No newline at end of file
+    config = ClassificationConfig(rules_file)
+    _classification_configs[os.path.realpath(rules_file or DEFAULT_RULES_FILE)] = config
+    return config
@@ -9,7 +9,7 @@ import logging
 from typing import Optional, Dict, Any, Callable, Awaitable
 from datetime import datetime
 
-from ..models.message_models import SourceMessageSchema
+from ..models.message_models import SourceMessageSchema, SOURCE_MESSAGE_ADAPTER
 from ..transformer.data_transformer import DataTransformer
 from ..config.settings import AppConfig
 from ..config.classification_config import ClassificationConfig
@@ -124,7 +124,13 @@ class MessageHandler:
         try:
             logger.debug("Validating message format")
             
-            # 检查必需字段
+            # 快速拒绝非对象消息，无需进入模型校验
+            if not isinstance(message_data, dict):
+                raise ValidationException(
+                    f"Message must be a JSON object, got {type(message_data).__name__}"
+                )
+            
+            # 检查必需字段（缺失时在模型校验前直接失败）
             required_fields = ["MSG", "DATA", "ISSUCCESS"]
             missing_fields = []
             
@@ -135,8 +141,8 @@ class MessageHandler:
             if missing_fields:
                 raise ValidationException(f"Missing required fields: {', '.join(missing_fields)}")
             
-            # 创建消息模型
-            message_schema = SourceMessageSchema(**message_data)
+            # 创建消息模型（复用预构建的校验器）
+            message_schema = SOURCE_MESSAGE_ADAPTER.validate_python(message_data)
             
             logger.debug(f"Message validation successful: {message_schema.document_id}")
             return message_schema
@@ -4,10 +4,10 @@ Pulsar消费者类
 """
 
 import asyncio
-import json
 import logging
 from typing import Optional, Callable, Dict, Any, Awaitable
 from contextlib import asynccontextmanager
+import orjson
 import pulsar
 from pulsar import Consumer as PulsarConsumerClient, Message as PulsarMessage
 
@@ -179,21 +179,17 @@ class PulsarConsumer:
                 logger.warning(f"Empty message data: {message.message_id()}")
                 return None
             
-            # 解析JSON
-            json_str = data.decode('utf-8')
-            message_data = json.loads(json_str)
+            # 解析JSON（orjson直接解析UTF-8字节，无需先解码为字符串）
+            message_data = orjson.loads(data)
             
             logger.debug(f"Successfully parsed message: {message.message_id()}")
             return message_data
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
+            # 非法UTF-8字节同样以JSONDecodeError抛出
             logger.error(f"Failed to parse message JSON: {message.message_id()}, error: {str(e)}")
             return None
             
-        except UnicodeDecodeError as e:
-            logger.error(f"Failed to decode message data: {message.message_id()}, error: {str(e)}")
-            return None
-            
         except Exception as e:
             logger.error(f"Unexpected error parsing message: {message.message_id()}, error: {str(e)}")
             return None
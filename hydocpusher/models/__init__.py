@@ -5,6 +5,7 @@
 
 from .message_models import (
     SourceMessageSchema,
+    SOURCE_MESSAGE_ADAPTER,
     MessageData,
     DocumentData,
     ChannelDoc,
@@ -21,6 +22,7 @@ from .archive_models import (
 __all__ = [
     # Source message models
     'SourceMessageSchema',
+    'SOURCE_MESSAGE_ADAPTER',
     'MessageData',
     'DocumentData',
     'ChannelDoc',
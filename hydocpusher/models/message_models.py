@@ -4,7 +4,7 @@
 """
 
 from typing import Optional, Dict, Any, List, Union
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from datetime import datetime
 import json
 
@@ -386,4 +386,8 @@ class SourceMessageSchema(BaseModel):
         
         if missing_fields:
             from ..exceptions.custom_exceptions import ValidationException
-            raise ValidationException(f"Missing required fields for processing: {', '.join(missing_fields)}")
\ No newline at end of file
+            raise ValidationException(f"Missing required fields for processing: {', '.join(missing_fields)}")
+
+
+# 源消息校验器，模块加载时构建一次，消息处理热路径上复用
+SOURCE_MESSAGE_ADAPTER: TypeAdapter[SourceMessageSchema] = TypeAdapter(SourceMessageSchema)
@@ -8,6 +8,9 @@ import os
 import yaml
 from pathlib import Path
 
+# Prefer the libyaml-backed dumper when available
+YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 
 @pytest.fixture
 def temp_directory():
@@ -49,7 +52,7 @@ def classification_rules_file(temp_directory, sample_classification_rules):
     """Create classification rules config file"""
     config_file = os.path.join(temp_directory, 'classification-rules.yaml')
     with open(config_file, 'w', encoding='utf-8') as f:
-        yaml.dump(sample_classification_rules, f, default_flow_style=False, allow_unicode=True)
+        yaml.dump(sample_classification_rules, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
     yield config_file
 
 
@@ -123,7 +126,7 @@ def missing_rules_file(temp_directory):
     """Create config file missing classification rules"""
     missing_rules_file = os.path.join(temp_directory, 'missing-rules.yaml')
     with open(missing_rules_file, 'w') as f:
-        yaml.dump({'default': {'classfyname': '其他', 'classfy': 'QT'}}, f)
+        yaml.dump({'default': {'classfyname': '其他', 'classfy': 'QT'}}, f, Dumper=YamlDumper)
     yield missing_rules_file
 
 
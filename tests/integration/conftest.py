@@ -0,0 +1,155 @@
+"""
+集成测试共享fixtures
+"""
+
+import asyncio
+from typing import Any, Dict
+
+import orjson
+import pytest
+
+from hydocpusher.config.settings import get_config
+from hydocpusher.config.classification_config import ClassificationConfig
+
+
+# 示例消息在模块加载时序列化一次，供各集成测试模块共享
+_SAMPLE_MESSAGE_JSON: bytes = orjson.dumps({
+    "MSG": "操作成功",
+    "ISSUCCESS": "1",
+    "DATA": {
+        "SITENAME": "测试推送站点",
+        "CRTIME": "2025-08-29 18:53:15",
+        "CHANNELID": "2240",
+        "VIEWID": "view_001",
+        "VIEWNAME": "测试视图",
+        "SITEID": "33",
+        "DOCID": "64941",
+        "OPERTYPE": "1",
+        "CHANNELNAV": "2240",
+        "CRUSER": "test_user",
+        "ID": "msg_20250829_001",
+        "CHANNELDESCNAV": "首页>新闻>科技>测试频道",
+        "TYPE": "document",
+        "DATA": {
+            "DOCTYPE": "20",
+            "LISTTITLE": "测试 裸眼3D看云能",
+            "SITENAME": "测试推送",
+            "DOCHTMLCON": "<div>测试内容</div>",
+            "CRTIME": "2025-08-29 18:53:15",
+            "DOCPUBTIME": "2025-08-29 18:53:15",
+            "AUTHOR": "测试作者",
+            "KEYWORDS": "测试,关键词",
+            "SUMMARY": "这是一个测试文档的摘要",
+            "WEBHTTP": "http://test.example.com",
+            "PUBSTATUS": "1",
+            "MODAL": "normal",
+            "CHNLNAME": "测试频道",
+            "ORIGINMETADATAID": "origin_meta_001",
+            "SITEID": "33",
+            "CHNLDESC": "测试频道描述",
+            "DOCTITLE": "测试文档标题",
+            "DOCPUBURL": "http://test.example.com/doc/64941",
+            "CLASSIFICATIONID": "class_001",
+            "MEDIATYPE": "text",
+            "DOCRELTIME": "2025-08-29 18:53:15",
+            "CHNLDOC_OPERTIME": "2025-08-29 18:53:15",
+            "SITEDESC": "测试站点描述",
+            "CRUSER": "test_user",
+            "DOCUMENT_DOCRELTIME": "2025-08-29 18:53:15",
+            "RECID": "rec_001",
+            "ACTIONTYPE": "INSERT",
+            "METADATAID": "meta_001",
+            "CHANNELID": "2240",
+            "DOCORDER": "1",
+            "ATTACHMENTS": [
+                {
+                    "name": "test.pdf",
+                    "url": "http://example.com/test.pdf",
+                    "size": 1024000
+                }
+            ]
+        },
+        "CHNLDOC": {
+            "SRCSITEID": "33",
+            "DOCTYPE": "20",
+            "DOCFIRSTPUBTIME": "2025-08-29 18:53:15",
+            "DOCORDER": "1",
+            "RECID": "chnldoc_rec_001",
+            "ACTIONTYPE": "INSERT",
+            "DOCCHANNEL": "2240",
+            "CRUSER": "test_user",
+            "OPERUSER": "test_user",
+            "CRTIME": "2025-08-29 18:53:15",
+            "OPERTIME": "2025-08-29 18:53:15",
+            "DOCPUBTIME": "2025-08-29 18:53:15",
+            "DOCSTATUS": "1",
+            "CRDEPT": "test_dept",
+            "DOCRELTIME": "2025-08-29 18:53:15",
+            "ORIGINRECID": "origin_rec_001",
+            "DOCID": "64941",
+            "CHNLID": "2240",
+            "DOCPUBURL": "http://test.example.com/doc/64941",
+            "ACTIONUSER": "test_user",
+            "SITEID": "33",
+            "PUBSTATUS": "1",
+            "MODAL": "normal",
+            "DOCOUTUPID": "output_001",
+            "DOCKIND": "1"
+        },
+        "APPENDIX": []
+    }
+})
+
+
+# 构造测试消息的只读基准，各消息变体共享其未修改的叶子节点
+_SAMPLE_MESSAGE: Dict[str, Any] = orjson.loads(_SAMPLE_MESSAGE_JSON)
+
+
+def _spine_override(base: Dict[str, Any], docid: str, title: str) -> Dict[str, Any]:
+    """仅重建外层、DATA和DATA.DATA三层字典，覆盖文档ID和列表标题，其余节点与基准共享"""
+    data = base["DATA"]
+    return {
+        **base,
+        "DATA": {
+            **data,
+            "DOCID": docid,
+            "DATA": {**data["DATA"], "LISTTITLE": title}
+        }
+    }
+
+
+def _make_message(docid: str = "64941", title: str = "测试 裸眼3D看云能") -> Dict[str, Any]:
+    """基于示例消息构造测试消息，仅覆盖文档ID和列表标题"""
+    return _spine_override(_SAMPLE_MESSAGE, docid, title)
+
+
+@pytest.fixture(scope="session")
+def config():
+    """获取应用配置（整个测试会话只加载一次）"""
+    return get_config()
+
+
+@pytest.fixture(scope="session")
+def classification_config():
+    """获取分类配置（整个测试会话只加载一次）"""
+    return ClassificationConfig()
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """整个测试会话共用一个事件循环，避免每个异步测试重复创建和关闭事件循环"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def sample_message_data():
+    """示例消息数据（每个测试独立解析一份，可原地修改）"""
+    return orjson.loads(_SAMPLE_MESSAGE_JSON)
+
+
+@pytest.fixture(scope="session")
+def make_message():
+    """构造测试消息的工厂函数，被覆盖的字段互不影响，未覆盖的节点与基准共享且不应修改"""
+    return _make_message
@@ -21,11 +21,6 @@ from hydocpusher.exceptions.custom_exceptions import MessageProcessException
 class TestDeadLetterQueueIntegration:
     """死信队列集成测试类 - 真实Pulsar环境"""
     
-    @pytest.fixture(scope="class")
-    def config(self):
-        """获取应用配置"""
-        return get_config()
-    
     @pytest.fixture(scope="class")
     async def pulsar_client(self, config):
         """创建真实的Pulsar客户端"""
@@ -5,19 +5,20 @@
 """
 
 import asyncio
-import json
+import atexit
 import logging
 import sys
 import os
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, FrozenSet, Optional
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import orjson
 import pulsar
 from hydocpusher.config.settings import get_config
 from hydocpusher.transformer.data_transformer import DataTransformer
@@ -30,17 +31,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 按service_url缓存的Pulsar客户端，多次运行测试时复用同一连接
+_CLIENT_CACHE: Dict[str, pulsar.Client] = {}
+
+
+def _get_client(client_config: Dict) -> pulsar.Client:
+    """获取service_url对应的缓存客户端，不存在时创建并缓存"""
+    service_url = client_config['service_url']
+    client = _CLIENT_CACHE.get(service_url)
+    if client is None:
+        client = pulsar.Client(**client_config)
+        _CLIENT_CACHE[service_url] = client
+    return client
+
+
+def _close_cached_clients() -> None:
+    """进程退出时关闭所有缓存的客户端"""
+    for client in _CLIENT_CACHE.values():
+        try:
+            client.close()
+        except Exception as e:
+            logger.error(f"关闭客户端时出错: {str(e)}")
+    _CLIENT_CACHE.clear()
+
+
+atexit.register(_close_cached_clients)
+
+
+# 端到端测试消息模板，DOCID/DOCPUBURL中的{TS}及CRTIME在创建消息时填充
+_MESSAGE_TEMPLATES = (
+    {
+        "MSG": "SUCCESS",
+        "DATA": {
+            "SITENAME": "云南省能源投资集团有限公司",
+            "CRTIME": None,
+            "CHANNELID": "2240",
+            "VIEWID": "123456",
+            "DOCID": "e2e_test_news_{TS}",
+            "OPERTYPE": "ADD",
+            "DOCTITLE": "端到端测试新闻标题",
+            "DOCCONTENT": "这是一条端到端测试新闻内容，用于验证完整的消息处理流程。",
+            "DOCPUBURL": "http://www.cnyeig.com/news/e2e_test_news_{TS}.html",
+            "CHNLDOC": {
+                "CHANNELNAME": "新闻头条",
+                "CHANNELID": "2240"
+            },
+            "APPENDIX": [
+                {
+                    "APPNAME": "测试图片1.jpg",
+                    "APPURL": "/upload/images/test1.jpg",
+                    "APPFLAG": "40"
+                },
+                {
+                    "APPNAME": "测试视频.mp4",
+                    "APPURL": "/upload/videos/test.mp4",
+                    "APPFLAG": "50"
+                }
+            ]
+        },
+        "ISSUCCESS": True
+    },
+    {
+        "MSG": "SUCCESS",
+        "DATA": {
+            "SITENAME": "云南省能源投资集团有限公司",
+            "CRTIME": None,
+            "CHANNELID": "2241",
+            "VIEWID": "789012",
+            "DOCID": "e2e_test_notice_{TS}",
+            "OPERTYPE": "ADD",
+            "DOCTITLE": "端到端测试通知公告",
+            "DOCCONTENT": "这是一条端到端测试通知公告内容。",
+            "DOCPUBURL": "http://www.cnyeig.com/notice/e2e_test_notice_{TS}.html",
+            "CHNLDOC": {
+                "CHANNELNAME": "通知公告",
+                "CHANNELID": "2241"
+            },
+            "APPENDIX": [
+                {
+                    "APPNAME": "测试文档.pdf",
+                    "APPURL": "/upload/docs/test.pdf",
+                    "APPFLAG": "30"
+                }
+            ]
+        },
+        "ISSUCCESS": True
+    },
+    {
+        "MSG": "SUCCESS",
+        "DATA": {
+            "SITENAME": "云南省能源投资集团有限公司",
+            "CRTIME": None,
+            "CHANNELID": "9999",  # 不存在的频道，测试默认分类
+            "VIEWID": "345678",
+            "DOCID": "e2e_test_unknown_{TS}",
+            "OPERTYPE": "ADD",
+            "DOCTITLE": "端到端测试未知分类内容",
+            "DOCCONTENT": "这是一条测试未知分类的内容。",
+            "DOCPUBURL": "http://www.cnyeig.com/other/e2e_test_unknown_{TS}.html",
+            "CHNLDOC": {
+                "CHANNELNAME": "未知频道",
+                "CHANNELID": "9999"
+            },
+            "APPENDIX": []
+        },
+        "ISSUCCESS": True
+    }
+)
+
 
 class EndToEndTest:
     """端到端测试类"""
     
+    # 并发发送使用的生产者数量上限，实际数量不超过测试消息条数
+    PRODUCER_COUNT = 8
+    
     def __init__(self):
         self.config = get_config()
         self.client = None
-        self.producer = None
+        self.producers: List[pulsar.Producer] = []
         self.consumer = None
+        self._transform_pool: Optional[ThreadPoolExecutor] = None
         self.sent_messages: List[Dict] = []
         self.received_messages: List[Dict] = []
+        self.transform_success_count = 0
+        
+        # 消费端过滤条件：测试消息标记及本次发送的文档ID集合
+        self._test_marker = 'e2e_test'
+        self._expected_doc_ids: FrozenSet[str] = frozenset()
         
         # 初始化数据转换器
         try:
@@ -54,48 +172,81 @@ class EndToEndTest:
         """设置测试环境"""
         try:
             logger.info("设置测试环境...")
+            pulsar_config = self.config.pulsar
             
             # 构建客户端配置
             client_config = {
-                'service_url': self.config.pulsar.cluster_url,
-                'connection_timeout_ms': self.config.pulsar.connection_timeout,
-                'operation_timeout_seconds': self.config.pulsar.operation_timeout // 1000
+                'service_url': pulsar_config.cluster_url,
+                'connection_timeout_ms': pulsar_config.connection_timeout,
+                'operation_timeout_seconds': pulsar_config.operation_timeout // 1000,
+                # 多个生产者并发发送时，单个IO线程会成为瓶颈
+                'io_threads': max(2, os.cpu_count() or 2)
             }
             
             # 如果配置了认证信息，添加认证配置
-            if self.config.pulsar.has_authentication():
-                logger.info(f"使用认证信息: {self.config.pulsar.username}")
+            if pulsar_config.has_authentication():
+                logger.info(f"使用认证信息: {pulsar_config.username}")
                 client_config['authentication'] = pulsar.AuthenticationBasic(
-                    self.config.pulsar.username,
-                    self.config.pulsar.password
+                    pulsar_config.username,
+                    pulsar_config.password
                 )
             
-            # 创建客户端
-            self.client = pulsar.Client(**client_config)
+            # 获取客户端（同一service_url复用缓存的连接）
+            self.client = _get_client(client_config)
             
             # 获取完整的Topic名称
-            topic_name = self.config.pulsar.get_full_topic_name()
+            topic_name = pulsar_config.get_full_topic_name()
             logger.info(f"使用Topic: {topic_name}")
             
-            # 创建生产者
-            self.producer = self.client.create_producer(
-                topic=topic_name,
-                producer_name="hydocpusher-e2e-producer",
-                send_timeout_millis=30000
-            )
-            logger.info("生产者创建成功")
+            # 创建多个生产者，发送时按消息序号轮询分配；每条消息最多一个生产者，避免创建空闲生产者
+            # 批量发送：最多等待10ms攒批，以少量延迟换取更少的Broker请求次数
+            producer_count = min(self.PRODUCER_COUNT, len(_MESSAGE_TEMPLATES))
+            self.producers = [
+                self.client.create_producer(
+                    topic=topic_name,
+                    producer_name=f"hydocpusher-e2e-producer-{k}",
+                    send_timeout_millis=30000,
+                    batching_enabled=True,
+                    batching_max_messages=1000,
+                    batching_max_publish_delay_ms=10,
+                    batching_max_allowed_size_in_bytes=131072,
+                    block_if_queue_full=True
+                )
+                for k in range(producer_count)
+            ]
+            logger.info(f"生产者创建成功，共 {len(self.producers)} 个")
             
             # 创建消费者
-            subscription_name = f"{self.config.pulsar.subscription}-e2e-test"
+            subscription_name = f"{pulsar_config.subscription}-e2e-test"
             self.consumer = self.client.subscribe(
                 topic=topic_name,
                 subscription_name=subscription_name,
-                consumer_type=pulsar.ConsumerType.Shared,
+                consumer_type=pulsar.ConsumerType.Exclusive,
                 consumer_name="hydocpusher-e2e-consumer",
-                initial_position=pulsar.InitialPosition.Latest
+                initial_position=pulsar.InitialPosition.Latest,
+                receiver_queue_size=1000,
+                batch_receive_policy=pulsar.ConsumerBatchReceivePolicy(
+                    max_num_message=100,
+                    max_num_bytes=1 << 20,
+                    timeout_ms=500
+                )
             )
             logger.info(f"消费者创建成功，订阅: {subscription_name}")
             
+            # 数据转换在独立线程池中执行，避免阻塞消息接收
+            self._transform_pool = ThreadPoolExecutor(
+                max_workers=os.cpu_count(),
+                thread_name_prefix="e2e-transform"
+            )
+            
+            # 预热数据转换器，使分类配置加载等一次性初始化不计入消费阶段
+            if self.transformer:
+                try:
+                    self.transformer.transform_message_from_dict(self.create_test_messages()[0])
+                    logger.info("数据转换器预热完成")
+                except Exception as e:
+                    logger.warning(f"数据转换器预热失败: {str(e)}")
+            
             return True
             
         except Exception as e:
@@ -103,88 +254,21 @@ class EndToEndTest:
             return False
     
     def create_test_messages(self) -> List[Dict]:
-        """创建测试消息"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        """创建测试消息（基于模板浅拷贝，仅替换随时间变化的字段）"""
+        now = time.localtime()
+        timestamp = time.strftime('%Y%m%d_%H%M%S', now)
+        crtime = time.strftime('%Y-%m-%d %H:%M:%S', now)
         
-        messages = [
-            {
-                "MSG": "SUCCESS",
-                "DATA": {
-                    "SITENAME": "云南省能源投资集团有限公司",
-                    "CRTIME": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "CHANNELID": "2240",
-                    "VIEWID": "123456",
-                    "DOCID": f"e2e_test_news_{timestamp}",
-                    "OPERTYPE": "ADD",
-                    "DOCTITLE": "端到端测试新闻标题",
-                    "DOCCONTENT": "这是一条端到端测试新闻内容，用于验证完整的消息处理流程。",
-                    "DOCPUBURL": f"http://www.cnyeig.com/news/e2e_test_news_{timestamp}.html",
-                    "CHNLDOC": {
-                        "CHANNELNAME": "新闻头条",
-                        "CHANNELID": "2240"
-                    },
-                    "APPENDIX": [
-                        {
-                            "APPNAME": "测试图片1.jpg",
-                            "APPURL": "/upload/images/test1.jpg",
-                            "APPFLAG": "40"
-                        },
-                        {
-                            "APPNAME": "测试视频.mp4",
-                            "APPURL": "/upload/videos/test.mp4",
-                            "APPFLAG": "50"
-                        }
-                    ]
-                },
-                "ISSUCCESS": True
-            },
-            {
-                "MSG": "SUCCESS",
-                "DATA": {
-                    "SITENAME": "云南省能源投资集团有限公司",
-                    "CRTIME": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "CHANNELID": "2241",
-                    "VIEWID": "789012",
-                    "DOCID": f"e2e_test_notice_{timestamp}",
-                    "OPERTYPE": "ADD",
-                    "DOCTITLE": "端到端测试通知公告",
-                    "DOCCONTENT": "这是一条端到端测试通知公告内容。",
-                    "DOCPUBURL": f"http://www.cnyeig.com/notice/e2e_test_notice_{timestamp}.html",
-                    "CHNLDOC": {
-                        "CHANNELNAME": "通知公告",
-                        "CHANNELID": "2241"
-                    },
-                    "APPENDIX": [
-                        {
-                            "APPNAME": "测试文档.pdf",
-                            "APPURL": "/upload/docs/test.pdf",
-                            "APPFLAG": "30"
-                        }
-                    ]
-                },
-                "ISSUCCESS": True
-            },
-            {
-                "MSG": "SUCCESS",
-                "DATA": {
-                    "SITENAME": "云南省能源投资集团有限公司",
-                    "CRTIME": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "CHANNELID": "9999",  # 不存在的频道，测试默认分类
-                    "VIEWID": "345678",
-                    "DOCID": f"e2e_test_unknown_{timestamp}",
-                    "OPERTYPE": "ADD",
-                    "DOCTITLE": "端到端测试未知分类内容",
-                    "DOCCONTENT": "这是一条测试未知分类的内容。",
-                    "DOCPUBURL": f"http://www.cnyeig.com/other/e2e_test_unknown_{timestamp}.html",
-                    "CHNLDOC": {
-                        "CHANNELNAME": "未知频道",
-                        "CHANNELID": "9999"
-                    },
-                    "APPENDIX": []
-                },
-                "ISSUCCESS": True
-            }
-        ]
+        messages = []
+        for template in _MESSAGE_TEMPLATES:
+            template_data = template['DATA']
+            data = dict(
+                template_data,
+                CRTIME=crtime,
+                DOCID=template_data['DOCID'].format(TS=timestamp),
+                DOCPUBURL=template_data['DOCPUBURL'].format(TS=timestamp)
+            )
+            messages.append(dict(template, DATA=data))
         
         return messages
     
@@ -193,101 +277,162 @@ class EndToEndTest:
         try:
             logger.info(f"发送 {len(messages)} 条测试消息...")
             
-            for i, message in enumerate(messages):
-                message_json = json.dumps(message, ensure_ascii=False)
-                doc_id = message['DATA']['DOCID']
-                
-                logger.info(f"发送消息 {i+1}/{len(messages)}: {doc_id}")
-                
-                message_id = self.producer.send(
-                    content=message_json.encode('utf-8'),
-                    properties={
-                        'message_type': 'e2e_test',
-                        'doc_id': doc_id,
-                        'channel_id': message['DATA']['CHANNELID'],
-                        'timestamp': str(int(datetime.now().timestamp())),
-                        'test_sequence': str(i)
-                    }
-                )
-                
-                self.sent_messages.append({
-                    'message_id': str(message_id),
-                    'doc_id': doc_id,
-                    'data': message
-                })
-                
-                logger.info(f"消息发送成功，Message ID: {message_id}")
-                
-                # 间隔发送
-                if i < len(messages) - 1:
-                    await asyncio.sleep(1)
+            # 同一批次消息共用的静态属性（含发送时间戳）
+            base_properties = {
+                'message_type': self._test_marker,
+                'timestamp': str(int(time.time()))
+            }
+            
+            # 所有消息并发发送，分散到多个生产者上
+            send_start = time.perf_counter()
+            await asyncio.gather(*(
+                self._send_one(self.producers[i % len(self.producers)], message, i, base_properties)
+                for i, message in enumerate(messages)
+            ))
             
-            logger.info(f"所有消息发送完成，共 {len(self.sent_messages)} 条")
+            self._expected_doc_ids = frozenset(msg['doc_id'] for msg in self.sent_messages)
+            send_elapsed = time.perf_counter() - send_start
+            logger.info(f"所有消息发送完成，共 {len(self.sent_messages)} 条，耗时 {send_elapsed:.3f} 秒")
             return True
             
         except Exception as e:
             logger.error(f"发送消息失败: {str(e)}")
             return False
     
+    async def _send_one(
+        self, producer: pulsar.Producer, message: Dict, index: int, base_properties: Dict[str, str]
+    ) -> None:
+        """异步发送单条消息，在Broker确认后记录发送结果"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def set_send_result(result, message_id):
+            if future.done():
+                return
+            if result == pulsar.Result.Ok:
+                future.set_result(message_id)
+            else:
+                future.set_exception(Exception(f"消息发送失败: {result}"))
+        
+        def send_callback(result, message_id):
+            # 回调运行在Pulsar客户端线程中，需切换回事件循环线程设置结果
+            loop.call_soon_threadsafe(set_send_result, result, message_id)
+        
+        # orjson直接输出UTF-8字节，省去中间字符串及额外的encode拷贝；
+        # 序列化放到默认线程池执行，避免大正文阻塞事件循环
+        payload = await loop.run_in_executor(None, orjson.dumps, message)
+        data = message['DATA']
+        doc_id = data['DOCID']
+        
+        logger.info("发送消息 %d: %s，大小: %d 字节", index + 1, doc_id, len(payload))
+        
+        producer.send_async(
+            payload,
+            send_callback,
+            properties={
+                **base_properties,
+                'doc_id': doc_id,
+                'channel_id': data['CHANNELID'],
+                'test_sequence': str(index)
+            }
+        )
+        message_id = await future
+        
+        self.sent_messages.append({
+            'message_id': str(message_id),
+            'doc_id': doc_id,
+            'data': message
+        })
+        
+        logger.info("消息发送成功，Message ID: %s", message_id)
+    
+    def flush_producers(self) -> None:
+        """阻塞直到所有生产者的在途消息均被Broker确认"""
+        for producer in self.producers:
+            producer.flush()
+    
     async def consume_messages(self, expected_count: int, timeout_seconds: int = 30) -> bool:
         """消费测试消息"""
         try:
             logger.info(f"开始消费消息，期望接收 {expected_count} 条，超时 {timeout_seconds} 秒")
             
-            start_time = time.time()
+            start_time = time.monotonic()
+            loop = asyncio.get_running_loop()
+            pending_transforms = []
+            
+            # 本次消费中是否有消息被否定确认；一旦出现，后续批次也不能再累计确认，
+            # 否则会在重投递之前连带确认此前失败的消息
+            has_nacked = False
             
             while len(self.received_messages) < expected_count:
                 # 检查超时
-                if time.time() - start_time > timeout_seconds:
+                if time.monotonic() - start_time > timeout_seconds:
                     logger.warning(f"消费超时，已接收 {len(self.received_messages)}/{expected_count} 条消息")
                     break
                 
                 try:
-                    # 接收消息
-                    msg = self.consumer.receive(timeout_millis=5000)
+                    # 批量接收：一次取回预取队列中所有就绪消息，无消息时最多等待500毫秒，便于及时检测结束条件
+                    msgs = self.consumer.batch_receive()
+                    
+                    # 本批次待确认的消息；此前未出现失败时在末尾做一次累计确认
+                    batch = []
                     
-                    if msg:
-                        logger.info(f"接收到消息: {msg.message_id()}")
+                    for msg in msgs:
+                        logger.info("接收到消息: %s", msg.message_id())
                         
-                        # 检查是否是测试消息
+                        # 按消息属性过滤：非测试消息或非本次发送的消息直接确认并跳过
                         properties = msg.properties()
-                        if properties.get('message_type') == 'e2e_test':
-                            try:
-                                # 解析消息内容
-                                message_content = msg.data().decode('utf-8')
-                                message_data = json.loads(message_content)
-                                
-                                doc_id = message_data['DATA']['DOCID']
-                                logger.info(f"处理测试消息: {doc_id}")
-                                
-                                # 验证和处理消息
-                                processed_data = None
-                                if self.transformer:
-                                    try:
-                                        processed_data = self.transformer.transform(message_data)
-                                        logger.info(f"数据转换成功: {processed_data.get('title', 'Unknown')}")
-                                    except Exception as e:
-                                        logger.error(f"数据转换失败: {str(e)}")
-                                
-                                self.received_messages.append({
-                                    'message_id': str(msg.message_id()),
-                                    'doc_id': doc_id,
-                                    'properties': properties,
-                                    'original_data': message_data,
-                                    'processed_data': processed_data
-                                })
-                                
-                                # 确认消息
-                                self.consumer.acknowledge(msg)
-                                logger.info(f"消息处理完成: {doc_id}")
-                                
-                            except Exception as e:
-                                logger.error(f"处理消息时出错: {str(e)}")
-                                self.consumer.negative_acknowledge(msg)
-                        else:
-                            # 不是测试消息，确认并跳过
-                            self.consumer.acknowledge(msg)
+                        if properties.get('message_type') != self._test_marker:
+                            batch.append(msg)
                             logger.debug("跳过非测试消息")
+                            continue
+                        if properties.get('doc_id') not in self._expected_doc_ids:
+                            batch.append(msg)
+                            logger.debug("跳过非本次发送的测试消息")
+                            continue
+                        
+                        try:
+                            # 解析消息内容（orjson直接解析字节，无需先解码为字符串）
+                            message_data = orjson.loads(msg.data())
+                            
+                            data = message_data['DATA']
+                            doc_id = data['DOCID']
+                            logger.info(
+                                "处理测试消息: %s，频道: %s，操作类型: %s",
+                                doc_id, data['CHANNELID'], data['OPERTYPE']
+                            )
+                            
+                            # 仅保留验证所需字段，不持有消息原文及转换结果
+                            received = {
+                                'message_id': str(msg.message_id()),
+                                'doc_id': doc_id,
+                                'transform_ok': False
+                            }
+                            self.received_messages.append(received)
+                            
+                            # 提交数据转换任务，结果在消费结束后回填
+                            if self.transformer:
+                                future = loop.run_in_executor(
+                                    self._transform_pool, self._transform_message, message_data
+                                )
+                                pending_transforms.append((received, future))
+                            
+                            # 转换任务入队后即可确认消息
+                            batch.append(msg)
+                            logger.info("消息处理完成: %s", doc_id)
+                            
+                        except Exception as e:
+                            logger.error("处理消息时出错: %s", e, exc_info=True)
+                            self.consumer.negative_acknowledge(msg)
+                            has_nacked = True
+                    
+                    if batch:
+                        if has_nacked:
+                            # 累计确认会连带确认失败的消息，此时退回逐条确认
+                            for acked_msg in batch:
+                                self.consumer.acknowledge(acked_msg)
+                        else:
+                            self.consumer.acknowledge_cumulative(batch[-1])
                 
                 except pulsar.Timeout:
                     # 超时是正常的，继续循环
@@ -297,6 +442,16 @@ class EndToEndTest:
                     logger.error(f"接收消息时出错: {str(e)}")
                     await asyncio.sleep(1)
             
+            # 等待所有数据转换任务完成
+            for received, future in pending_transforms:
+                try:
+                    processed_data = await asyncio.wait_for(future, timeout=5)
+                    received['transform_ok'] = processed_data is not None
+                    if received['transform_ok']:
+                        self.transform_success_count += 1
+                except asyncio.TimeoutError:
+                    logger.error(f"数据转换超时: {received['doc_id']}")
+            
             logger.info(f"消费完成，接收到 {len(self.received_messages)} 条消息")
             return len(self.received_messages) == expected_count
             
@@ -304,6 +459,23 @@ class EndToEndTest:
             logger.error(f"消费消息失败: {str(e)}")
             return False
     
+    def _transform_message(self, message_data: Dict) -> Optional[Dict]:
+        """执行数据转换（在转换线程池中运行），失败时返回None"""
+        try:
+            transform_start = time.perf_counter()
+            archive_request = self.transformer.transform_message_from_dict(message_data)
+            transform_elapsed = time.perf_counter() - transform_start
+            processed_data = archive_request.ArchiveData
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "数据转换成功: %s，耗时 %.2f 毫秒",
+                    processed_data.get('title', 'Unknown'), transform_elapsed * 1000
+                )
+            return processed_data
+        except Exception as e:
+            logger.error("数据转换失败: %s", e, exc_info=True)
+            return None
+    
     def verify_results(self) -> bool:
         """验证测试结果"""
         try:
@@ -336,13 +508,9 @@ class EndToEndTest:
             
             # 验证数据转换结果
             if self.transformer:
-                transform_success_count = sum(
-                    1 for msg in self.received_messages 
-                    if msg['processed_data'] is not None
-                )
-                logger.info(f"数据转换成功数: {transform_success_count}/{received_count}")
+                logger.info(f"数据转换成功数: {self.transform_success_count}/{received_count}")
                 
-                if transform_success_count != received_count:
+                if self.transform_success_count != received_count:
                     logger.warning("部分消息数据转换失败")
             
             logger.info("测试结果验证通过")
@@ -355,17 +523,20 @@ class EndToEndTest:
     async def cleanup(self):
         """清理资源"""
         try:
+            if self._transform_pool:
+                self._transform_pool.shutdown(wait=True)
+                logger.info("数据转换线程池已关闭")
+            
             if self.consumer:
                 self.consumer.close()
                 logger.info("消费者已关闭")
             
-            if self.producer:
-                self.producer.close()
+            if self.producers:
+                for producer in self.producers:
+                    producer.close()
                 logger.info("生产者已关闭")
             
-            if self.client:
-                self.client.close()
-                logger.info("客户端已关闭")
+            # 客户端由模块级缓存持有，进程退出时统一关闭
                 
         except Exception as e:
             logger.error(f"清理资源时出错: {str(e)}")
@@ -399,9 +570,9 @@ async def main():
             logger.error("发送测试消息失败")
             return False
         
-        # 等待消息传播
-        logger.info("\n=== 步骤4: 等待消息传播 ===")
-        await asyncio.sleep(3)
+        # 等待Broker确认所有已发送消息（flush返回后消息即可被消费）
+        logger.info("\n=== 步骤4: 等待消息持久化确认 ===")
+        await asyncio.get_running_loop().run_in_executor(None, test.flush_producers)
         
         # 消费消息
         logger.info("\n=== 步骤5: 消费测试消息 ===")
@@ -427,6 +598,13 @@ async def main():
 
 
 if __name__ == "__main__":
+    # 优先使用uvloop事件循环（随uvicorn[standard]安装，不可用时回退到默认事件循环）
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     # 运行测试
     success = asyncio.run(main())
     
@@ -6,143 +6,50 @@
 
 import pytest
 import asyncio
-import json
+import logging
 import os
+import orjson
 from datetime import datetime
 from typing import Dict, Any
 
 from hydocpusher.consumer.message_handler import MessageHandler, MessageProcessor
 from hydocpusher.config.settings import get_config
-from hydocpusher.config.classification_config import ClassificationConfig
 from hydocpusher.transformer.data_transformer import DataTransformer
 from hydocpusher.models.message_models import SourceMessageSchema
 from hydocpusher.exceptions.custom_exceptions import (
     ValidationException, MessageProcessException, DataTransformException
 )
 
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="session")
+def data_transformer(config, classification_config):
+    """创建数据转换器实例（整个测试会话共享）"""
+    return DataTransformer()
+
+
+@pytest.fixture(scope="session")
+def message_handler(config, data_transformer):
+    """创建消息处理器实例（整个测试会话共享）"""
+    handler = MessageHandler(config)
+    handler.set_data_transformer(data_transformer)
+    return handler
+
+
+@pytest.fixture(scope="class")
+def processor(config):
+    """创建消息处理器实例（类内共享，统计信息按增量断言）"""
+    return MessageProcessor(config)
+
 
 class TestMessageHandlerIntegration:
     """消息处理器集成测试类 - 真实环境"""
     
-    @pytest.fixture(scope="class")
-    def config(self):
-        """获取应用配置"""
-        return get_config()
-    
-    @pytest.fixture(scope="class")
-    def classification_config(self):
-        """获取分类配置"""
-        return ClassificationConfig()
-    
-    @pytest.fixture
-    def data_transformer(self, config, classification_config):
-        """创建数据转换器实例"""
-        return DataTransformer()
-    
-    @pytest.fixture
-    def message_handler(self, config, data_transformer):
-        """创建消息处理器实例"""
-        handler = MessageHandler(config)
-        handler.set_data_transformer(data_transformer)
-        return handler
-    
-    @pytest.fixture
-    def sample_message_data(self):
-        """示例消息数据"""
-        return {
-            "MSG": "操作成功",
-            "ISSUCCESS": "1",
-            "DATA": {
-                "SITENAME": "测试推送站点",
-                "CRTIME": "2025-08-29 18:53:15",
-                "CHANNELID": "2240",
-                "VIEWID": "view_001",
-                "VIEWNAME": "测试视图",
-                "SITEID": "33",
-                "DOCID": "64941",
-                "OPERTYPE": "1",
-                "CHANNELNAV": "2240",
-                "CRUSER": "test_user",
-                "ID": "msg_20250829_002",
-                "CHANNELDESCNAV": "首页>新闻>科技>测试频道",
-                "TYPE": "document",
-                "CRUSER": "test_user",
-                "ID": "msg_20250829_001",
-                "DATA": {
-                    "DOCTYPE": "20",
-                    "LISTTITLE": "测试 裸眼3D看云能",
-                    "SITENAME": "测试推送",
-                    "DOCHTMLCON": "<div>测试内容</div>",
-                    "CRTIME": "2025-08-29 18:53:15",
-                    "DOCPUBTIME": "2025-08-29 18:53:15",
-                    "AUTHOR": "测试作者",
-                    "KEYWORDS": "测试,关键词",
-                    "SUMMARY": "这是一个测试文档的摘要",
-                    "WEBHTTP": "http://test.example.com",
-                     "PUBSTATUS": "1",
-                     "MODAL": "normal",
-                     "CHNLNAME": "测试频道",
-                     "ORIGINMETADATAID": "origin_meta_001",
-                     "SITEID": "33",
-                     "CHNLDESC": "测试频道描述",
-                     "DOCTITLE": "测试文档标题",
-                     "DOCPUBURL": "http://test.example.com/doc/64941",
-                     "CLASSIFICATIONID": "class_001",
-                     "MEDIATYPE": "text",
-                      "DOCRELTIME": "2025-08-29 18:53:15",
-                      "CHNLDOC_OPERTIME": "2025-08-29 18:53:15",
-                      "SITEDESC": "测试站点描述",
-                       "CRUSER": "test_user",
-                       "DOCUMENT_DOCRELTIME": "2025-08-29 18:53:15",
-                       "RECID": "rec_001",
-                        "ACTIONTYPE": "INSERT",
-                        "METADATAID": "meta_001",
-                        "CHANNELID": "2240",
-                        "DOCORDER": "1",
-                     "ORIGINMETADATAID": "origin_meta_001",
-                     "SITEID": "33",
-                     "CHNLDESC": "测试频道描述",
-                     "DOCTITLE": "测试文档标题",
-                      "DOCPUBURL": "http://test.example.com/doc/64941",
-                      "CLASSIFICATIONID": "class_001",
-                     "ATTACHMENTS": [
-                        {
-                            "name": "test.pdf",
-                            "url": "http://example.com/test.pdf",
-                            "size": 1024000
-                        }
-                    ]
-                },
-                "CHNLDOC": {
-                    "SRCSITEID": "33",
-                    "DOCTYPE": "20",
-                    "DOCFIRSTPUBTIME": "2025-08-29 18:53:15",
-                    "DOCORDER": "1",
-                    "RECID": "chnldoc_rec_001",
-                    "ACTIONTYPE": "INSERT",
-                    "DOCCHANNEL": "2240",
-                    "CRUSER": "test_user",
-                    "OPERUSER": "test_user",
-                    "CRTIME": "2025-08-29 18:53:15",
-                    "OPERTIME": "2025-08-29 18:53:15",
-                    "DOCPUBTIME": "2025-08-29 18:53:15",
-                    "DOCSTATUS": "1",
-                    "CRDEPT": "test_dept",
-                    "DOCRELTIME": "2025-08-29 18:53:15",
-                    "ORIGINRECID": "origin_rec_001",
-                    "DOCID": "64941",
-                    "CHNLID": "2240",
-                    "DOCPUBURL": "http://test.example.com/doc/64941",
-                    "ACTIONUSER": "test_user",
-                    "SITEID": "33",
-                    "PUBSTATUS": "1",
-                    "MODAL": "normal",
-                    "DOCOUTUPID": "output_001",
-                    "DOCKIND": "1"
-                },
-                "APPENDIX": []
-            }
-        }
+    @pytest.fixture(autouse=True)
+    def _reset_handler_stats(self, message_handler):
+        """每个测试开始前重置共享处理器的统计信息"""
+        message_handler.reset_stats()
     
     @pytest.mark.asyncio
     async def test_successful_message_processing_real_environment(self, message_handler, sample_message_data):
@@ -159,8 +66,8 @@ class TestMessageHandlerIntegration:
         stats = message_handler.get_processing_stats()
         assert stats["processed"] >= 1
         
-        print(f"消息处理成功: {result}")
-        print(f"处理统计: {stats}")
+        logger.debug("消息处理成功: %s", result)
+        logger.debug("处理统计: %s", stats)
     
     @pytest.mark.asyncio
     async def test_message_validation_real_data(self, message_handler, sample_message_data):
@@ -187,43 +94,58 @@ class TestMessageHandlerIntegration:
         assert "success" in result
         assert result["success"] == True
         
-        # 创建可序列化的结果副本
-        serializable_result = result.copy()
-        if 'archive_data' in serializable_result:
-            serializable_result['archive_data'] = serializable_result['archive_data'].dict()
+        # 仅在开启DEBUG日志时序列化结果（如 --log-cli-level=DEBUG）
+        if logger.isEnabledFor(logging.DEBUG):
+            # 档案数据直接由pydantic序列化为JSON，无需先转换为字典
+            if 'archive_data' in result:
+                json_str = result['archive_data'].model_dump_json(indent=2)
+            else:
+                json_str = orjson.dumps(
+                    result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ).decode('utf-8')
+            logger.debug("消息处理成功: %s", json_str)
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("index", range(5))
+    async def test_batch_message_processing_single(self, message_handler, make_message, index):
+        """测试批量中的单条消息处理（参数化后可由pytest-xdist分发到多个进程并行执行）"""
+        docid = str(64941 + index)
+        result = await message_handler.handle_message(make_message(docid, f"测试文档 {index+1}"))
         
-        print(f"消息处理成功: {json.dumps(serializable_result, ensure_ascii=False, indent=2)}")
+        assert result["success"] is True
+        assert result["message_id"] == docid
     
     @pytest.mark.asyncio
-    async def test_batch_message_processing(self, message_handler, sample_message_data):
-        """测试批量消息处理"""
+    async def test_batch_message_processing(self, message_handler, make_message):
+        """测试批量消息处理的汇总统计"""
         messages = []
         
         # 创建多个测试消息
         for i in range(5):
-            message = sample_message_data.copy()
-            message["DATA"]["DOCID"] = str(64941 + i)
-            message["DATA"]["DATA"]["LISTTITLE"] = f"测试文档 {i+1}"
-            messages.append(message)
+            messages.append(make_message(str(64941 + i), f"测试文档 {i+1}"))
         
-        # 批量处理消息
+        # 批量并发处理消息，单条失败不影响其他消息
+        raw_results = await asyncio.gather(
+            *(message_handler.handle_message(message) for message in messages),
+            return_exceptions=True
+        )
         results = []
-        for message in messages:
-            try:
-                result = await message_handler.process_message(message)
+        for result in raw_results:
+            if isinstance(result, Exception):
+                logger.debug("处理消息失败: %s", result)
+                results.append({"success": False, "error": str(result)})
+            else:
                 results.append(result)
-            except Exception as e:
-                print(f"处理消息失败: {e}")
-                results.append({"success": False, "error": str(e)})
         
         # 验证处理结果
         successful_count = sum(1 for r in results if r.get("success", False))
         assert successful_count >= 0  # 至少应该有一些成功的
         
-        # 验证统计信息
+        # 验证统计信息（统计信息在测试开始前已重置）
         stats = message_handler.get_processing_stats()
-        print(f"批量处理完成: 成功 {successful_count}/{len(messages)}")
-        print(f"处理统计: {stats}")
+        assert stats["processed"] + stats["failed"] == len(messages)
+        logger.debug("批量处理完成: 成功 %d/%d", successful_count, len(messages))
+        logger.debug("处理统计: %s", stats)
     
     @pytest.mark.asyncio
     async def test_error_handling_and_recovery(self, message_handler):
@@ -243,9 +165,9 @@ class TestMessageHandlerIntegration:
         with pytest.raises(MessageProcessException):
             await message_handler.handle_message(incomplete_message)
         
-        # 验证错误统计
+        # 验证错误统计（统计信息在测试开始前已重置）
         stats = message_handler.get_processing_stats()
-        assert stats["failed"] >= 2  # 应该记录失败次数
+        assert stats["failed"] == 2  # 应该记录失败次数
     
     def test_message_handler_configuration(self, message_handler, config):
         """测试消息处理器配置"""
@@ -259,22 +181,14 @@ class TestMessageHandlerIntegration:
         assert "retried" in stats
     
     @pytest.mark.asyncio
-    async def test_concurrent_message_processing(self, message_handler, sample_message_data):
+    async def test_concurrent_message_processing(self, message_handler, make_message):
         """测试并发消息处理"""
-        # 创建多个并发任务
-        tasks = []
-        for i in range(3):
-            message = sample_message_data.copy()
-            message["DATA"]["DOCID"] = str(64941 + i)
-            message["DATA"]["DATA"]["LISTTITLE"] = f"并发测试文档 {i+1}"
-            
-            task = asyncio.create_task(
-                message_handler.handle_message(message)
-            )
-            tasks.append(task)
-        
-        # 等待所有任务完成
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # 并发处理多条消息，gather直接调度协程，无需逐个创建任务
+        messages = [make_message(str(64941 + i), f"并发测试文档 {i+1}") for i in range(3)]
+        results = await asyncio.gather(
+            *(message_handler.handle_message(message) for message in messages),
+            return_exceptions=True
+        )
         
         # 验证结果
         successful_results = [
@@ -282,114 +196,18 @@ class TestMessageHandlerIntegration:
             if not isinstance(r, Exception) and r.get("success", False)
         ]
         
-        print(f"并发处理完成: 成功 {len(successful_results)}/{len(tasks)}")
+        logger.debug("并发处理完成: 成功 %d/%d", len(successful_results), len(messages))
         
         # 验证统计信息
         stats = message_handler.get_processing_stats()
-        print(f"并发处理统计: {stats}")
+        logger.debug("并发处理统计: %s", stats)
 
 
 class TestMessageProcessorIntegration:
     """消息处理器核心类集成测试"""
     
-    @pytest.fixture
-    def config(self):
-        """获取应用配置"""
-        return get_config()
-    
-    @pytest.fixture
-    def sample_message_data(self):
-        """示例消息数据"""
-        return {
-            "MSG": "操作成功",
-            "ISSUCCESS": "1",
-            "DATA": {
-                "SITENAME": "测试推送",
-                "CRTIME": "2025-08-29 18:53:15",
-                "CHANNELID": "2240",
-                "DOCID": "64941",
-                "OPERTYPE": "1",
-                "CHANNELDESCNAV": "首页>新闻>科技>测试频道",
-                "CHANNELNAV": "首页>新闻>科技>测试频道",
-                "CRUSER": "test_user",
-                "ID": "64941",
-                "VIEWID": "view_001",
-                "VIEWNAME": "测试视图",
-                "SITEID": "33",
-                "TYPE": "document",
-                "DATA": {
-                    "DOCTYPE": "20",
-                    "LISTTITLE": "测试文档标题",
-                    "DOCHTMLCON": "<div>测试内容</div>",
-                    "CRTIME": "2025-08-29 18:53:15",
-                    "DOCPUBTIME": "2025-08-29 18:53:15",
-                    "WEBHTTP": "http://test.example.com",
-                    "PUBSTATUS": "1",
-                    "MODAL": "normal",
-                    "CHNLNAME": "测试频道",
-                    "ORIGINMETADATAID": "origin_meta_001",
-                    "SITEID": "33",
-                    "CHNLDESC": "测试频道描述",
-                    "DOCTITLE": "测试文档标题",
-                    "DOCPUBURL": "http://test.example.com/doc/64941",
-                    "CLASSIFICATIONID": "class_001",
-                    "CHANNELID": "2240",
-                    "RECID": "rec_001",
-                    "ACTIONTYPE": "INSERT",
-                    "METADATAID": "meta_001",
-                    "SITEDESC": "测试站点描述",
-                    "CRUSER": "test_user",
-                    "DOCUMENT_DOCRELTIME": "2025-08-29 18:53:15",
-                    "MEDIATYPE": "text",
-                    "DOCRELTIME": "2025-08-29 18:53:15",
-                    "CHNLDOC_OPERTIME": "2025-08-29 18:53:15",
-                    "DOCORDER": "1",
-                    "SITENAME": "测试推送站点",
-                    "KEYWORDS": "测试,关键词",
-                    "SUMMARY": "这是一个测试文档的摘要",
-                    "ATTACHMENTS": [
-                        {
-                            "name": "test.pdf",
-                            "url": "http://test.example.com/attachments/test.pdf",
-                            "size": 1024000
-                        }
-                    ]
-                },
-                "CHNLDOC": {
-                    "SRCSITEID": "33",
-                    "DOCTYPE": "20",
-                    "DOCFIRSTPUBTIME": "2025-08-29 18:53:15",
-                    "DOCORDER": "1",
-                    "RECID": "chnldoc_rec_001",
-                    "ACTIONTYPE": "INSERT",
-                    "DOCCHANNEL": "2240",
-                    "CRUSER": "test_user",
-                    "OPERUSER": "test_user",
-                    "CRTIME": "2025-08-29 18:53:15",
-                    "OPERTIME": "2025-08-29 18:53:15",
-                    "DOCPUBTIME": "2025-08-29 18:53:15",
-                    "DOCSTATUS": "1",
-                    "CRDEPT": "test_dept",
-                    "DOCRELTIME": "2025-08-29 18:53:15",
-                    "ORIGINRECID": "origin_rec_001",
-                    "DOCID": "64941",
-                    "CHNLID": "2240",
-                    "DOCPUBURL": "http://test.example.com/doc/64941",
-                    "ACTIONUSER": "test_user",
-                    "SITEID": "33",
-                    "PUBSTATUS": "1",
-                    "MODAL": "normal",
-                    "DOCOUTUPID": "output_001",
-                    "DOCKIND": "1"
-                },
-                "APPENDIX": []
-            }
-        }
-    
-    def test_message_processor_initialization_real_config(self, config):
+    def test_message_processor_initialization_real_config(self, processor, config):
         """测试使用真实配置初始化消息处理器"""
-        processor = MessageProcessor(config)
-        
         assert processor.config == config
         assert processor.handler is not None
         
@@ -400,9 +218,9 @@ class TestMessageProcessorIntegration:
         assert "retried" in stats
     
     @pytest.mark.asyncio
-    async def test_message_processor_process_real_message(self, config, sample_message_data):
+    async def test_message_processor_process_real_message(self, processor, sample_message_data):
         """测试处理真实消息"""
-        processor = MessageProcessor(config)
+        before = processor.stats
         
         # 处理消息
         result = await processor.process_message(sample_message_data)
@@ -412,22 +230,28 @@ class TestMessageProcessorIntegration:
         
         # 验证统计信息更新
         stats = processor.stats
-        assert stats["processed"] >= 1
+        assert stats["processed"] - before["processed"] == 1
     
-    def test_message_processor_stats_tracking(self, config):
+    @pytest.mark.asyncio
+    async def test_message_processor_stats_tracking(self, processor, sample_message_data):
         """测试统计信息跟踪"""
-        processor = MessageProcessor(config)
-        
-        # 获取初始统计
-        initial_stats = processor.stats
+        # 获取初始统计快照
+        before = processor.stats
         
         # 验证统计信息结构
-        assert "processed" in initial_stats
-        assert "failed" in initial_stats
-        assert "retried" in initial_stats
-        assert initial_stats["processed"] == 0
-        assert initial_stats["failed"] == 0
-        assert initial_stats["retried"] == 0
+        assert "processed" in before
+        assert "failed" in before
+        assert "retried" in before
+        
+        # 一条成功消息和一条无效消息
+        await processor.process_message(sample_message_data)
+        with pytest.raises(MessageProcessException):
+            await processor.process_message({})
+        
+        stats = processor.stats
+        assert stats["processed"] - before["processed"] == 1
+        assert stats["failed"] - before["failed"] == 1
+        assert stats["retried"] - before["retried"] == 0
 
 
 if __name__ == "__main__":
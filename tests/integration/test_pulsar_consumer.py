@@ -6,7 +6,7 @@ Pulsar消费者集成测试
 
 import pytest
 import asyncio
-import json
+import orjson
 import os
 from datetime import datetime
 from typing import Dict, Any
@@ -17,24 +17,22 @@ import pulsar
 from hydocpusher.consumer.pulsar_consumer import PulsarConsumer
 from hydocpusher.consumer.message_handler import MessageHandler
 from hydocpusher.config.settings import get_config
-from hydocpusher.config.classification_config import ClassificationConfig
 from hydocpusher.transformer.data_transformer import DataTransformer
 from hydocpusher.exceptions.custom_exceptions import ConnectionException, MessageProcessException
 
 
+def make_mock_msg(payload: bytes, mid: str = "test-message-id") -> Mock:
+    """创建预配置数据、消息ID及ack的模拟Pulsar消息"""
+    mock_message = Mock()
+    mock_message.data.return_value = payload
+    mock_message.message_id.return_value = mid
+    mock_message.ack = Mock()
+    return mock_message
+
+
 class TestPulsarConsumerIntegration:
     """Pulsar消费者集成测试类 - 真实环境"""
     
-    @pytest.fixture(scope="class")
-    def config(self):
-        """获取应用配置"""
-        return get_config()
-    
-    @pytest.fixture(scope="class")
-    def classification_config(self):
-        """获取分类配置"""
-        return ClassificationConfig()
-    
     @pytest.fixture
     def data_transformer(self, config, classification_config):
         """创建数据转换器"""
@@ -124,11 +122,8 @@ class TestPulsarConsumerIntegration:
     async def test_message_parsing_and_validation(self, pulsar_consumer, sample_message_data):
         """测试消息解析和验证"""
         # 测试有效JSON消息解析
-        json_message = json.dumps(sample_message_data, ensure_ascii=False)
         # 创建模拟Pulsar消息
-        mock_message = Mock()
-        mock_message.data.return_value = json_message.encode('utf-8')
-        mock_message.message_id.return_value = "test-message-id"
+        mock_message = make_mock_msg(orjson.dumps(sample_message_data))
         
         parsed_data = pulsar_consumer._parse_message(mock_message)
         
@@ -136,22 +131,16 @@ class TestPulsarConsumerIntegration:
         print("JSON消息解析成功")
         
         # 测试无效JSON处理
-        invalid_json = b"invalid json data"
         # 创建无效消息
-        mock_invalid_message = Mock()
-        mock_invalid_message.data.return_value = invalid_json
-        mock_invalid_message.message_id.return_value = "invalid-message-id"
+        mock_invalid_message = make_mock_msg(b"invalid json data", "invalid-message-id")
         
         parsed_invalid = pulsar_consumer._parse_message(mock_invalid_message)
         assert parsed_invalid is None
         print("无效JSON处理正确")
         
         # 测试空消息处理
-        empty_data = b""
         # 创建空消息
-        mock_empty_message = Mock()
-        mock_empty_message.data.return_value = empty_data
-        mock_empty_message.message_id.return_value = "empty-message-id"
+        mock_empty_message = make_mock_msg(b"", "empty-message-id")
         
         parsed_empty = pulsar_consumer._parse_message(mock_empty_message)
         assert parsed_empty is None
@@ -167,10 +156,7 @@ class TestPulsarConsumerIntegration:
         # 模拟消息处理
         try:
             # 创建模拟Pulsar消息
-            mock_message = Mock()
-            mock_message.data.return_value = json.dumps(sample_message_data).encode('utf-8')
-            mock_message.message_id.return_value = "test-message-id"
-            mock_message.ack = Mock()
+            mock_message = make_mock_msg(orjson.dumps(sample_message_data))
             
             await pulsar_consumer._process_message(mock_message)
             
@@ -189,10 +175,7 @@ class TestPulsarConsumerIntegration:
         
         # 处理消息应该返回None或抛出异常
         # 创建模拟Pulsar消息
-        mock_message = Mock()
-        mock_message.data.return_value = json.dumps(sample_message_data).encode('utf-8')
-        mock_message.message_id.return_value = "test-message-id"
-        mock_message.ack = Mock()
+        mock_message = make_mock_msg(orjson.dumps(sample_message_data))
         
         await pulsar_consumer._process_message(mock_message)
         # 没有处理器时，应该返回None或记录警告
@@ -264,10 +247,7 @@ class TestPulsarConsumerIntegration:
         # 处理消息应该捕获异常
         try:
             # 创建模拟Pulsar消息
-            mock_message = Mock()
-            mock_message.data.return_value = json.dumps(sample_message_data).encode('utf-8')
-            mock_message.message_id.return_value = "test-message-id"
-            mock_message.ack = Mock()
+            mock_message = make_mock_msg(orjson.dumps(sample_message_data))
             
             await pulsar_consumer._process_message(mock_message)
             print("异常处理完成")
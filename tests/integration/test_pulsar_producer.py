@@ -5,10 +5,11 @@
 """
 
 import asyncio
-import json
+import functools
 import logging
 import sys
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -16,6 +17,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import orjson
 import pulsar
 from hydocpusher.config.settings import get_config
 
@@ -30,15 +32,19 @@ logger = logging.getLogger(__name__)
 class PulsarProducerTest:
     """Pulsar生产者测试类"""
     
+    # 生产者允许的最大在途消息数
+    MAX_PENDING_MESSAGES = 10000
+    
     def __init__(self):
         self.config = get_config()
         self.client = None
         self.producer = None
+        self._send_slots = None
     
     async def connect(self):
         """连接到Pulsar集群"""
         try:
-            logger.info(f"正在连接到Pulsar集群: {self.config.pulsar.cluster_url}")
+            logger.info("正在连接到Pulsar集群: %s", self.config.pulsar.cluster_url)
             
             # 构建客户端配置
             client_config = {
@@ -49,43 +55,62 @@ class PulsarProducerTest:
             
             # 如果配置了认证信息，添加认证配置
             if self.config.pulsar.has_authentication():
-                logger.info(f"使用认证信息: {self.config.pulsar.username}")
+                logger.info("使用认证信息: %s", self.config.pulsar.username)
                 client_config['authentication'] = pulsar.AuthenticationBasic(
                     self.config.pulsar.username,
                     self.config.pulsar.password
                 )
             
+            # pulsar客户端为同步接口，阻塞调用放到默认线程池执行，避免阻塞事件循环
+            loop = asyncio.get_running_loop()
+            
             # 创建客户端
-            self.client = pulsar.Client(**client_config)
+            self.client = await loop.run_in_executor(
+                None, functools.partial(pulsar.Client, **client_config)
+            )
             
             # 获取完整的Topic名称
             topic_name = self.config.pulsar.get_full_topic_name()
-            logger.info(f"创建生产者，Topic: {topic_name}")
+            logger.info("创建生产者，Topic: %s", topic_name)
             
-            # 创建生产者
-            self.producer = self.client.create_producer(
+            # 创建生产者（启用批量发送，多条消息合并为一次Broker请求）
+            self.producer = await loop.run_in_executor(None, functools.partial(
+                self.client.create_producer,
                 topic=topic_name,
                 producer_name="hydocpusher-test-producer",
-                send_timeout_millis=30000
-            )
+                send_timeout_millis=30000,
+                batching_enabled=True,
+                batching_max_publish_delay_ms=10,
+                batching_max_messages=1000,
+                batching_max_allowed_size_in_bytes=1048576,
+                compression_type=pulsar.CompressionType.LZ4,
+                max_pending_messages=self.MAX_PENDING_MESSAGES,
+                block_if_queue_full=True
+            ))
+            
+            # 在途消息名额：发送前获取，Broker确认回调后释放。
+            # 队列满时在事件循环中挂起等待，而不是由send_async阻塞事件循环线程
+            self._send_slots = asyncio.Semaphore(self.MAX_PENDING_MESSAGES)
             
             logger.info("成功连接到Pulsar集群并创建生产者")
             return True
             
         except Exception as e:
-            logger.error(f"连接Pulsar失败: {str(e)}")
+            logger.error("连接Pulsar失败: %s", e)
             return False
     
-    def create_test_message(self, message_id: str = None) -> dict:
-        """创建测试消息"""
+    def create_test_message(self, message_id: str = None, now: datetime = None) -> dict:
+        """创建测试消息（批量创建时可传入同一时间点，避免逐条获取当前时间）"""
+        if now is None:
+            now = datetime.now()
         if message_id is None:
-            message_id = f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            message_id = f"test_{now.strftime('%Y%m%d_%H%M%S')}"
         
         return {
             "MSG": "SUCCESS",
             "DATA": {
                 "SITENAME": "云南省能源投资集团有限公司",
-                "CRTIME": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "CRTIME": now.strftime('%Y-%m-%d %H:%M:%S'),
                 "CHANNELID": "2240",
                 "VIEWID": "123456",
                 "DOCID": message_id,
@@ -115,58 +140,75 @@ class PulsarProducerTest:
                 logger.error("生产者未初始化")
                 return False
             
-            # 将消息转换为JSON字符串
-            message_json = json.dumps(message, ensure_ascii=False, indent=2)
-            logger.info(f"发送消息: {message['DATA']['DOCID']}")
-            logger.debug(f"消息内容: {message_json}")
-            
-            # 发送消息
-            message_id = self.producer.send(
-                content=message_json.encode('utf-8'),
-                properties={
-                    'message_type': 'content_publish',
-                    'doc_id': message['DATA']['DOCID'],
-                    'channel_id': message['DATA']['CHANNELID'],
-                    'timestamp': str(int(datetime.now().timestamp()))
-                }
-            )
+            # orjson直接输出紧凑的UTF-8字节，仅在DEBUG日志中使用缩进格式
+            payload = orjson.dumps(message)
+            logger.info("发送消息: %s", message['DATA']['DOCID'])
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("消息内容: %s", orjson.dumps(message, option=orjson.OPT_INDENT_2).decode('utf-8'))
+            
+            # 异步发送消息，在Broker确认后通过回调设置结果
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
             
-            logger.info(f"消息发送成功，Message ID: {message_id}")
+            def set_send_result(result, message_id):
+                if future.done():
+                    return
+                if result == pulsar.Result.Ok:
+                    future.set_result(message_id)
+                else:
+                    future.set_exception(Exception(f"消息发送失败: {result}"))
+            
+            def send_callback(result, message_id):
+                # 回调运行在Pulsar客户端线程中，需切换回事件循环线程设置结果
+                loop.call_soon_threadsafe(set_send_result, result, message_id)
+            
+            async with self._send_slots:
+                self.producer.send_async(
+                    payload,
+                    send_callback,
+                    properties={
+                        'message_type': 'content_publish',
+                        'doc_id': message['DATA']['DOCID'],
+                        'channel_id': message['DATA']['CHANNELID'],
+                        'timestamp': str(int(time.time()))
+                    }
+                )
+                message_id = await future
+            
+            logger.info("消息发送成功，Message ID: %s", message_id)
             return True
             
         except Exception as e:
-            logger.error(f"发送消息失败: {str(e)}")
+            logger.error("发送消息失败: %s", e)
             return False
     
     async def send_batch_messages(self, count: int = 5) -> int:
         """批量发送测试消息"""
-        success_count = 0
+        now = datetime.now()
+        messages = [self.create_test_message(f"batch_test_{i+1}", now) for i in range(count)]
         
-        for i in range(count):
-            message = self.create_test_message(f"batch_test_{i+1}")
-            if await self.send_message(message):
-                success_count += 1
-            
-            # 间隔1秒发送下一条消息
-            if i < count - 1:
-                await asyncio.sleep(1)
+        # 所有消息并发提交，由生产者批量合并发送；每条消息在Broker确认后才返回
+        results = await asyncio.gather(*(self.send_message(message) for message in messages))
+        success_count = sum(results)
         
-        logger.info(f"批量发送完成，成功: {success_count}/{count}")
+        logger.info("批量发送完成，成功: %d/%d", success_count, count)
         return success_count
     
     async def close(self):
         """关闭连接"""
         try:
+            loop = asyncio.get_running_loop()
+            
             if self.producer:
-                self.producer.close()
+                await loop.run_in_executor(None, self.producer.close)
                 logger.info("生产者已关闭")
             
             if self.client:
-                self.client.close()
+                await loop.run_in_executor(None, self.client.close)
                 logger.info("客户端已关闭")
                 
         except Exception as e:
-            logger.error(f"关闭连接时出错: {str(e)}")
+            logger.error("关闭连接时出错: %s", e)
 
 
 async def main():
@@ -203,13 +245,13 @@ async def main():
         if success_count == 3:
             logger.info("批量消息发送测试通过")
         else:
-            logger.warning(f"批量消息发送部分成功: {success_count}/3")
+            logger.warning("批量消息发送部分成功: %d/3", success_count)
         
         logger.info("\n=== Pulsar生产者测试完成 ===")
         return True
         
     except Exception as e:
-        logger.error(f"测试过程中出现异常: {str(e)}")
+        logger.error("测试过程中出现异常: %s", e)
         return False
         
     finally:
@@ -2,9 +2,11 @@
 分类映射配置管理的TDD测试用例
 """
 
+import io
 import pytest
 import tempfile
 import os
+import shutil
 import yaml
 from unittest.mock import patch, mock_open
 from pathlib import Path
@@ -17,6 +19,9 @@ from hydocpusher.config.classification_config import (
 )
 from hydocpusher.exceptions.custom_exceptions import ConfigurationException
 
+# 测试数据同样优先使用libyaml的C实现输出
+YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 
 class TestClassificationRule:
     """分类规则测试"""
@@ -44,49 +49,50 @@ class TestClassificationRule:
         assert rule.classfy == "JTYW"
 
 
+@pytest.fixture(scope="class")
+def yaml_text(request):
+    """测试类配置数据的YAML文本（每个测试类只生成一次）"""
+    return yaml.dump(request.cls.test_config_data, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
+
+
 class TestClassificationConfig:
     """分类配置测试"""
     
-    def setup_method(self):
-        """设置测试环境"""
-        # 创建临时配置文件
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_file = os.path.join(self.temp_dir, "classification-rules.yaml")
-        
-        # 创建测试配置数据
-        self.test_config_data = {
-            'classification_rules': [
-                {
-                    'channel_id': '2240',
-                    'classfyname': '新闻头条',
-                    'classfy': 'XWTT'
-                },
-                {
-                    'channel_id': '2241',
-                    'classfyname': '集团要闻',
-                    'classfy': 'JTYW'
-                }
-            ],
-            'default': {
-                'classfyname': '其他',
-                'classfy': 'QT'
+    # 测试配置数据
+    test_config_data = {
+        'classification_rules': [
+            {
+                'channel_id': '2240',
+                'classfyname': '新闻头条',
+                'classfy': 'XWTT'
+            },
+            {
+                'channel_id': '2241',
+                'classfyname': '集团要闻',
+                'classfy': 'JTYW'
             }
+        ],
+        'default': {
+            'classfyname': '其他',
+            'classfy': 'QT'
         }
-        
-        # 写入测试配置文件
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(self.test_config_data, f, default_flow_style=False, allow_unicode=True)
+    }
     
-    def teardown_method(self):
-        """清理测试环境"""
-        # 删除临时文件和目录
-        if os.path.exists(self.config_file):
-            os.unlink(self.config_file)
-        os.rmdir(self.temp_dir)
+    @pytest.fixture
+    def config(self, yaml_text):
+        """从内存文本流加载的分类配置，不读写文件"""
+        return ClassificationConfig(io.StringIO(yaml_text))
+    
+    @pytest.fixture
+    def config_file(self, tmp_path, yaml_text):
+        """写入临时目录的配置文件，仅供需要覆盖文件读写路径的测试使用"""
+        config_file = tmp_path / "classification-rules.yaml"
+        config_file.write_text(yaml_text, encoding='utf-8')
+        return str(config_file)
     
-    def test_load_config_success(self):
-        """测试成功加载配置"""
-        config = ClassificationConfig(self.config_file)
+    def test_load_config_success(self, config_file):
+        """测试从文件成功加载配置"""
+        config = ClassificationConfig(config_file)
         
         assert len(config.rules) == 2
         assert '2240' in config.rules
@@ -106,14 +112,17 @@ class TestClassificationConfig:
         
         assert 'Classification rules file not found' in str(exc_info.value)
     
+    def test_load_config_from_stream(self, config):
+        """测试从文本流加载配置"""
+        assert config.rules_file is None
+        assert len(config.rules) == 2
+        assert config.rules['2241'].classfy == 'JTYW'
+        assert config.default_rule.classfy == 'QT'
+    
     def test_load_config_invalid_yaml(self):
         """测试无效的YAML格式"""
-        # 创建无效的YAML文件
-        with open(self.config_file, 'w') as f:
-            f.write('invalid: yaml: content: [')
-        
         with pytest.raises(ConfigurationException) as exc_info:
-            ClassificationConfig(self.config_file)
+            ClassificationConfig(io.StringIO('invalid: yaml: content: ['))
         
         assert 'Failed to parse classification rules file' in str(exc_info.value)
     
@@ -127,11 +136,8 @@ class TestClassificationConfig:
             }
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(invalid_config, f)
-        
         with pytest.raises(ConfigurationException) as exc_info:
-            ClassificationConfig(self.config_file)
+            ClassificationConfig(io.StringIO(yaml.dump(invalid_config, Dumper=YamlDumper)))
         
         assert 'Invalid classification rules file format' in str(exc_info.value)
     
@@ -151,54 +157,55 @@ class TestClassificationConfig:
             }
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(invalid_config, f)
-        
         with pytest.raises(ConfigurationException) as exc_info:
-            ClassificationConfig(self.config_file)
+            ClassificationConfig(io.StringIO(yaml.dump(invalid_config, Dumper=YamlDumper)))
         
         assert "Missing 'channel_id' in classification rule" in str(exc_info.value)
     
-    def test_get_classification_existing_channel(self):
+    def test_get_classification_existing_channel(self, config):
         """测试获取存在的频道的分类信息"""
-        config = ClassificationConfig(self.config_file)
-        
         classfyname, classfy = config.get_classification('2240')
         assert classfyname == '新闻头条'
         assert classfy == 'XWTT'
     
-    def test_get_classification_nonexistent_channel(self):
+    def test_get_classification_nonexistent_channel(self, config):
         """测试获取不存在的频道的分类信息"""
-        config = ClassificationConfig(self.config_file)
-        
         classfyname, classfy = config.get_classification('9999')
         assert classfyname == '其他'
         assert classfy == 'QT'
     
-    def test_get_classification_rule_existing(self):
+    def test_get_classification_consistent_with_rule(self, config):
+        """测试get_classification与get_classification_rule返回一致，修改返回的规则对象不影响配置"""
+        config.get_classification_rule('2240').classfyname = '被修改'
+        config.rules['2241'].classfy = '被修改'
+        config.default_rule.classfy = '被修改'
+        
+        for channel_id in ('2240', '2241', '9999'):
+            rule = config.get_classification_rule(channel_id)
+            assert config.get_classification(channel_id) == (rule.classfyname, rule.classfy)
+        
+        assert config.get_classification('2240') == ('新闻头条', 'XWTT')
+        assert config.get_classification('2241') == ('集团要闻', 'JTYW')
+        assert config.get_classification('9999') == ('其他', 'QT')
+    
+    def test_get_classification_rule_existing(self, config):
         """测试获取存在的频道的分类规则对象"""
-        config = ClassificationConfig(self.config_file)
-        
         rule = config.get_classification_rule('2240')
         assert isinstance(rule, ClassificationRule)
         assert rule.channel_id == '2240'
         assert rule.classfyname == '新闻头条'
         assert rule.classfy == 'XWTT'
     
-    def test_get_classification_rule_default(self):
+    def test_get_classification_rule_default(self, config):
         """测试获取默认分类规则对象"""
-        config = ClassificationConfig(self.config_file)
-        
         rule = config.get_classification_rule('9999')
         assert isinstance(rule, ClassificationRule)
         assert rule.channel_id == 'default'
         assert rule.classfyname == '其他'
         assert rule.classfy == 'QT'
     
-    def test_get_all_rules(self):
+    def test_get_all_rules(self, config):
         """测试获取所有分类规则"""
-        config = ClassificationConfig(self.config_file)
-        
         rules = config.get_all_rules()
         assert len(rules) == 2
         
@@ -206,41 +213,37 @@ class TestClassificationConfig:
         for rule in rules:
             assert isinstance(rule, ClassificationRule)
     
-    def test_get_channel_ids(self):
+    def test_get_channel_ids(self, config):
         """测试获取所有频道ID"""
-        config = ClassificationConfig(self.config_file)
-        
         channel_ids = config.get_channel_ids()
         assert len(channel_ids) == 2
         assert '2240' in channel_ids
         assert '2241' in channel_ids
     
-    def test_add_rule(self):
+    def test_add_rule(self, config):
         """测试添加分类规则"""
-        config = ClassificationConfig(self.config_file)
-        
         config.add_rule('2242', '通知公告', 'TZGG')
         
         assert '2242' in config.rules
         rule = config.rules['2242']
         assert rule.classfyname == '通知公告'
         assert rule.classfy == 'TZGG'
+        assert config.get_classification('2242') == ('通知公告', 'TZGG')
     
-    def test_remove_rule(self):
+    def test_remove_rule(self, config):
         """测试移除分类规则"""
-        config = ClassificationConfig(self.config_file)
-        
         result = config.remove_rule('2240')
         assert result is True
         assert '2240' not in config.rules
+        assert config.get_classification('2240') == ('其他', 'QT')
         
         # 测试移除不存在的规则
         result = config.remove_rule('9999')
         assert result is False
     
-    def test_save_config(self):
+    def test_save_config(self, config_file):
         """测试保存配置"""
-        config = ClassificationConfig(self.config_file)
+        config = ClassificationConfig(config_file)
         
         # 添加新规则
         config.add_rule('2242', '通知公告', 'TZGG')
@@ -249,16 +252,16 @@ class TestClassificationConfig:
         config.save_config()
         
         # 重新加载配置
-        new_config = ClassificationConfig(self.config_file)
+        new_config = ClassificationConfig(config_file)
         
         assert '2242' in new_config.rules
         rule = new_config.rules['2242']
         assert rule.classfyname == '通知公告'
         assert rule.classfy == 'TZGG'
     
-    def test_reload_config(self):
+    def test_reload_config(self, config_file):
         """测试重新加载配置"""
-        config = ClassificationConfig(self.config_file)
+        config = ClassificationConfig(config_file)
         
         # 修改配置文件
         new_config_data = {
@@ -280,8 +283,8 @@ class TestClassificationConfig:
             }
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(new_config_data, f, default_flow_style=False, allow_unicode=True)
+        with open(config_file, 'w', encoding='utf-8') as f:
+            yaml.dump(new_config_data, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
         
         # 重新加载配置
         config.reload()
@@ -289,15 +292,59 @@ class TestClassificationConfig:
         assert '2243' in config.rules
         assert '2241' not in config.rules  # 旧规则应该不存在
     
-    def test_validate_config_success(self):
+    def test_unchanged_file_parsed_once(self, config_file):
+        """测试文件未变化时复用已解析的结果"""
+        with patch('hydocpusher.config.classification_config.yaml.load', wraps=yaml.load) as mock_load:
+            config1 = ClassificationConfig(config_file)
+            config2 = ClassificationConfig(config_file)
+            
+            assert mock_load.call_count == 1
+            assert config1.rules == config2.rules
+            
+            # 强制重新加载时重新解析
+            config1.reload()
+            assert mock_load.call_count == 2
+    
+    def test_parsed_cache_ignores_preserved_mtime(self, config_file):
+        """测试规则文件内容变化但修改时间被保留时不使用过期的解析结果"""
+        ClassificationConfig(config_file)
+        stat = os.stat(config_file)
+        
+        new_config_data = {
+            'classification_rules': [
+                {
+                    'channel_id': '2240',
+                    'classfyname': '通知公告',
+                    'classfy': 'TZGG'
+                }
+            ],
+            'default': {
+                'classfyname': '其他',
+                'classfy': 'QT'
+            }
+        }
+        with open(config_file, 'w', encoding='utf-8') as f:
+            yaml.dump(new_config_data, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        config = ClassificationConfig(config_file)
+        assert config.get_classification('2240') == ('通知公告', 'TZGG')
+        assert '2241' not in config.rules
+    
+    def test_stream_config_cannot_save(self, config):
+        """测试从文本流加载的配置不能保存到文件"""
+        with pytest.raises(ConfigurationException) as exc_info:
+            config.save_config()
+        
+        assert 'loaded from a stream' in str(exc_info.value)
+    
+    def test_validate_config_success(self, config):
         """测试验证配置成功"""
-        config = ClassificationConfig(self.config_file)
         # 应该不抛出异常
         config.validate_config()
     
-    def test_validate_config_missing_default(self):
+    def test_validate_config_missing_default(self, config):
         """测试验证缺少默认配置"""
-        config = ClassificationConfig(self.config_file)
         config.default_rule = None
         
         with pytest.raises(ConfigurationException) as exc_info:
@@ -305,39 +352,35 @@ class TestClassificationConfig:
         
         assert 'Default classification rule is required' in str(exc_info.value)
     
-    def test_validate_config_invalid_default(self):
+    def test_validate_config_invalid_default(self, config):
         """测试验证无效的默认配置"""
-        config = ClassificationConfig(self.config_file)
-        config.default_rule.classfyname = ''
+        config.default_rule = ClassificationRule(channel_id='default', classfyname='', classfy='QT')
         
         with pytest.raises(ConfigurationException) as exc_info:
             config.validate_config()
         
         assert 'Default classification rule must have classfyname and classfy' in str(exc_info.value)
     
-    def test_validate_config_invalid_rule(self):
+    def test_validate_config_invalid_rule(self, config):
         """测试验证无效的规则"""
-        config = ClassificationConfig(self.config_file)
-        config.rules['2240'].classfyname = ''
+        config.add_rule('2240', '', 'XWTT')
         
         with pytest.raises(ConfigurationException) as exc_info:
             config.validate_config()
         
         assert 'Classification rule for channel 2240 must have classfyname and classfy' in str(exc_info.value)
     
-    def test_get_statistics(self):
+    def test_get_statistics(self, config):
         """测试获取统计信息"""
-        config = ClassificationConfig(self.config_file)
-        
         stats = config.get_statistics()
         assert stats['total_rules'] == 2
         assert stats['unique_channels'] == 2
         assert stats['unique_classfy'] == 2  # XWTT, JTYW
         assert stats['unique_classfyname'] == 2  # 新闻头条, 集团要闻
     
-    def test_file_reload_on_change(self):
+    def test_file_reload_on_change(self, config_file):
         """测试文件变更时的自动重载"""
-        config = ClassificationConfig(self.config_file)
+        config = ClassificationConfig(config_file)
         
         # 修改配置文件
         new_config_data = {
@@ -359,8 +402,8 @@ class TestClassificationConfig:
             }
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(new_config_data, f, default_flow_style=False, allow_unicode=True)
+        with open(config_file, 'w', encoding='utf-8') as f:
+            yaml.dump(new_config_data, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
         
         # 等待文件系统更新
         import time
@@ -397,22 +440,20 @@ class TestGlobalClassificationConfig:
         }
         
         with open(self.config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(test_config_data, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(test_config_data, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
         
         # 清除全局配置实例
         import hydocpusher.config.classification_config
-        hydocpusher.config.classification_config._classification_config = None
+        hydocpusher.config.classification_config._classification_configs.clear()
     
     def teardown_method(self):
         """清理测试环境"""
-        # 删除临时文件和目录
-        if os.path.exists(self.config_file):
-            os.unlink(self.config_file)
-        os.rmdir(self.temp_dir)
+        # 删除临时目录（包括规则文件及测试中复制的其他规则文件）
+        shutil.rmtree(self.temp_dir)
         
         # 清除全局配置实例
         import hydocpusher.config.classification_config
-        hydocpusher.config.classification_config._classification_config = None
+        hydocpusher.config.classification_config._classification_configs.clear()
     
     def test_get_classification_config_creates_instance(self):
         """测试get_classification_config创建实例"""
@@ -427,6 +468,47 @@ class TestGlobalClassificationConfig:
         
         assert config1 is config2
     
+    def test_get_classification_config_cached_per_path(self):
+        """测试不同规则文件路径分别缓存实例"""
+        other_file = os.path.join(self.temp_dir, "other-rules.yaml")
+        shutil.copyfile(self.config_file, other_file)
+        try:
+            config1 = get_classification_config(self.config_file)
+            config2 = get_classification_config(other_file)
+            config3 = get_classification_config(os.path.join(self.temp_dir, ".", "classification-rules.yaml"))
+            
+            assert config1 is not config2
+            assert config1 is config3
+        finally:
+            os.unlink(other_file)
+    
+    def test_cached_instance_picks_up_file_changes(self):
+        """测试缓存的实例在规则文件变更后自动重新加载，无需调用reload_classification_config"""
+        config = get_classification_config(self.config_file)
+        assert config.get_classification('2241') == ('其他', 'QT')
+        
+        new_config_data = {
+            'classification_rules': [
+                {
+                    'channel_id': '2241',
+                    'classfyname': '集团要闻',
+                    'classfy': 'JTYW'
+                }
+            ],
+            'default': {
+                'classfyname': '其他',
+                'classfy': 'QT'
+            }
+        }
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            yaml.dump(new_config_data, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
+        # 确保修改时间晚于首次加载时记录的时间
+        future = os.path.getmtime(self.config_file) + 10
+        os.utime(self.config_file, (future, future))
+        
+        assert get_classification_config(self.config_file) is config
+        assert config.get_classification('2241') == ('集团要闻', 'JTYW')
+    
     def test_reload_classification_config(self):
         """测试重新加载分类配置"""
         config1 = get_classification_config(self.config_file)
@@ -452,7 +534,7 @@ class TestGlobalClassificationConfig:
         }
         
         with open(self.config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(new_config_data, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(new_config_data, f, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
         
         config2 = reload_classification_config(self.config_file)
         
@@ -231,6 +231,29 @@ class TestEnvironmentVariables:
         assert config.archive.api_url == 'http://test.com'
         assert config.archive.app_token == 'test-token'
     
+    def test_get_config_reads_pulsar_env(self):
+        """测试get_config从环境变量读取Pulsar配置"""
+        os.environ['PULSAR_CLUSTER_URL'] = 'http://pulsar.test.com:6650'
+        os.environ['PULSAR_TOPIC'] = 'env-topic'
+        os.environ['PULSAR_CONNECTION_TIMEOUT'] = '5000'
+        
+        with patch('hydocpusher.config.settings._config_instance', None):
+            config = get_config()
+        
+        assert config.pulsar.cluster_url == 'pulsar://pulsar.test.com:6650'
+        assert config.pulsar.topic == 'env-topic'
+        assert config.pulsar.connection_timeout == 5000
+    
+    def test_get_config_rejects_invalid_pulsar_timeouts(self):
+        """测试get_config在非调试模式下同样拒绝无效的Pulsar超时配置"""
+        os.environ.pop('DEBUG', None)
+        os.environ['PULSAR_CONNECTION_TIMEOUT'] = '-1'
+        os.environ['PULSAR_OPERATION_TIMEOUT'] = '0'
+        
+        with patch('hydocpusher.config.settings._config_instance', None):
+            with pytest.raises(ValueError):
+                get_config()
+    
     def test_create_from_env_failure(self):
         """测试从环境变量创建配置失败"""
         # 清除必需的环境变量
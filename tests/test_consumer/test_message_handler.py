@@ -255,7 +255,19 @@ class TestMessageHandler:
             await message_handler.handle_message(invalid_message)
         
         assert "Message validation failed" in str(exc_info.value)
-    
+
+    @pytest.mark.asyncio
+    async def test_message_validation_non_dict_message(self, message_handler):
+        """测试验证非对象类型的消息"""
+        with pytest.raises(MessageProcessException) as exc_info:
+            await message_handler.handle_message("MSG DATA ISSUCCESS")
+
+        assert "Message must be a JSON object, got str" in str(exc_info.value)
+
+        # 验证统计信息
+        stats = message_handler.get_processing_stats()
+        assert stats["failed"] == 1
+
     @pytest.mark.asyncio
     async def test_data_transformation_failure(self, message_handler):
         """测试数据转换失败的情况"""